@@ -0,0 +1,132 @@
+"""Startup-time benchmark.
+
+Measures, in fresh interpreters:
+  - how long ``import main`` takes
+  - how long until uvicorn answers /health/live (accepting connections)
+  - how long until /health/ready reports the background warm-up is done
+
+Every instance runs in a temporary directory with its own database and
+settings, the in-memory coordination backend and the scheduler disabled, so
+it is safe to run next to a live bot (inside the container:
+``python benchmarks/startup.py``). Pass --max-import-ms / --max-live-ms to exit
+non-zero on a regression.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import main; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+# Never touch the live bot: no shared lease, no posting loop
+ISOLATED_SETTINGS = {
+    "coordination_backend": "memory",
+    "scheduler_enabled": False,
+}
+
+def isolated_env(workdir: str) -> dict:
+    """Environment pointing an app instance at its own database and settings."""
+    config_dir = os.path.join(workdir, "config")
+    os.makedirs(config_dir, exist_ok=True)
+    with open(os.path.join(config_dir, "settings.json"), "w") as f:
+        json.dump(ISOLATED_SETTINGS, f)
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [APP_DIR, env.get("PYTHONPATH")]))
+    env["NEWS_BOT_CONFIG_DIR"] = config_dir
+    env["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(workdir, 'news_bot.db')}"
+    return env
+
+def measure_import() -> float:
+    with tempfile.TemporaryDirectory() as workdir:
+        output = subprocess.check_output(
+            [sys.executable, "-c", IMPORT_SNIPPET], cwd=workdir, env=isolated_env(workdir), text=True
+        )
+    return float(output.strip().splitlines()[-1])
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for(url: str, deadline: float) -> bool:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.01)
+    return False
+
+def measure_server(timeout: float) -> tuple:
+    """Return (ms until live, ms until ready); None for a probe that timed out."""
+    port = free_port()
+    workdir = tempfile.TemporaryDirectory()
+    env = isolated_env(workdir.name)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=workdir.name, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        base = f"http://127.0.0.1:{port}"
+        live = (time.perf_counter() - start) * 1000 if wait_for(f"{base}/health/live", deadline) else None
+        ready = (time.perf_counter() - start) * 1000 if wait_for(f"{base}/health/ready", deadline) else None
+        return live, ready
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        workdir.cleanup()
+
+def summarize(label: str, samples: list) -> float:
+    values = [s for s in samples if s is not None]
+    if not values:
+        print(f"{label:<12} timed out")
+        return float("inf")
+    median = statistics.median(values)
+    print(f"{label:<12} median {median:8.1f} ms   min {min(values):8.1f} ms   max {max(values):8.1f} ms")
+    return median
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for each server")
+    parser.add_argument("--skip-server", action="store_true", help="only measure the import")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-live-ms", type=float)
+    args = parser.parse_args()
+
+    import_ms = summarize("import main", [measure_import() for _ in range(args.runs)])
+
+    live_ms = None
+    if not args.skip_server:
+        results = [measure_server(args.timeout) for _ in range(args.runs)]
+        live_ms = summarize("live", [live for live, _ in results])
+        summarize("ready", [ready for _, ready in results])
+
+    failed = False
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"Import regression: {import_ms:.1f} ms > {args.max_import_ms:.1f} ms")
+        failed = True
+    if args.max_live_ms is not None and live_ms is not None and live_ms > args.max_live_ms:
+        print(f"Startup regression: {live_ms:.1f} ms > {args.max_live_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, select
 import datetime
+import os
 
-DATABASE_URL = "sqlite+aiosqlite:///./news_bot.db"
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///./news_bot.db")
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, echo=False)
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
@@ -27,6 +28,7 @@ class Tweet(Base):
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text)
     tweet_id = Column(String, unique=True)
+    post_key = Column(String, index=True)  # article link + scheduled slot
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     likes = Column(Integer, default=0)
     retweets = Column(Integer, default=0)
@@ -42,10 +44,61 @@ class Comment(Base):
     author = Column(String)
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
+class Lease(Base):
+    __tablename__ = "leases"
+
+    name = Column(String, primary_key=True)
+    owner = Column(String)
+    expires_at = Column(DateTime)
+
+class Schedule(Base):
+    __tablename__ = "schedules"
+
+    name = Column(String, primary_key=True)
+    last_post_time = Column(DateTime, nullable=True)
+    next_post_time = Column(DateTime, nullable=True)
+    last_tweet_id = Column(String, nullable=True)
+
+class Message(Base):
+    __tablename__ = "messages"
+    # Never reuse ids after a prune, subscribers track the last id they saw
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    channel = Column(String, index=True)
+    payload = Column(Text)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+
+def _add_missing_columns(conn):
+    """create_all doesn't alter existing tables, add columns introduced since."""
+    columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(tweets)")}
+    if "post_key" not in columns:
+        conn.exec_driver_sql("ALTER TABLE tweets ADD COLUMN post_key VARCHAR")
+        conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_tweets_post_key ON tweets (post_key)")
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+async def close_db():
+    await engine.dispose()
+
+def post_key(link: str, next_post_time: datetime.datetime) -> str:
+    """Identify a post by its article and slot, independent of the generated text."""
+    return f"{link}|{next_post_time.isoformat()}"
+
+async def record_tweet(content: str, tweet_id: str, key: str):
+    async with AsyncSessionLocal() as session:
+        session.add(Tweet(content=content, tweet_id=tweet_id, post_key=key))
+        await session.commit()
+
+async def was_posted(key: str) -> bool:
+    """Check whether the post for this article and slot already went out."""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(Tweet.id).where(Tweet.post_key == key).limit(1))
+        return result.first() is not None
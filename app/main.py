@@ -3,93 +3,260 @@ from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
+from contextlib import asynccontextmanager
 import asyncio
 from datetime import datetime
 import json
-from services.news_service import NewsService
-from services.ai_service import AIService
-from services.twitter_service import TwitterService
-from services.settings_service import SettingsService
-from database import AsyncSessionLocal, init_db
+from services.container import ServiceContainer
+from services.tweet_composer import MAX_WEIGHTED_LENGTH, weighted_length
 from config import Settings
 import os
-import httpx
+import sys
+import importlib
 import logging
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
-app.mount("/static", StaticFiles(directory="/app/static"), name="static")
-templates = Jinja2Templates(directory="/app/templates")
+# Services initialization, clients and background tasks are owned by the container.
+# Nothing heavy is imported or built here, see warm_up().
+services = ServiceContainer()
 
-# Services initialization
-settings_service = SettingsService()
-news_service = NewsService(settings_service)
-ai_service = AIService()
-twitter_service = TwitterService(settings_service)
-
-# Global settings
+# Posting schedule, loaded from the coordination backend by whichever worker leads
 current_settings = None
 
-# Global variables for WebSocket connections
+# Seconds between stats broadcasts from the leader
+STATS_INTERVAL = 60
+
+# Global variables for WebSocket connections, local to this worker
 terminal_connections = []
 
+# Latest scheduler updates broadcast by the leader, keyed by update type
+shared_updates = {}
+
 class TerminalLogHandler(logging.Handler):
-    async def emit(self, record):
-        message = self.format(record)
-        for connection in terminal_connections:
-            try:
-                await connection.send_json({"content": message})
-            except:
-                terminal_connections.remove(connection)
+    def emit(self, record):
+        # Broadcast so terminals connected to any worker see the leader's logs
+        if not services.is_built('coordinator'):
+            return  # Still warming up
+        try:
+            services.coordinator.publish_nowait("terminal", {"content": self.format(record)})
+        except RuntimeError:
+            pass  # No running event loop
+
+async def forward_terminal_message(message):
+    for connection in list(terminal_connections):
+        try:
+            await connection.send_json(message)
+        except:
+            terminal_connections.remove(connection)
+
+async def store_shared_update(message):
+    shared_updates[message["type"]] = message
+
+async def apply_shared_settings(message):
+    services.settings_service.apply_settings(message["settings"])
 
 # Add terminal handler to logger
 terminal_handler = TerminalLogHandler()
 terminal_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 logger.addHandler(terminal_handler)
 
+async def publish(candidate):
+    """Post a candidate unless it already went out (e.g. before a restart)."""
+    from database import post_key, record_tweet, was_posted
+
+    tweets = candidate["tweets"]
+    key = post_key(candidate["link"], candidate["next_post_time"])
+    if await was_posted(key):
+        logger.warning("Candidate was already posted, skipping")
+        return True
+
+    result = await services.twitter_service.post_thread(tweets)
+    if result["status"] == "partial":
+        # Part of the thread is live, posting it again would duplicate the story
+        logger.warning(f"Thread only partially posted, marking slot done: {result['message']}")
+    elif result["status"] != "success":
+        logger.error(f"Error posting candidate: {result['message']}")
+        return False
+
+    await record_tweet(tweets[0], result["tweet_id"], key)
+    return True
+
+def build_current_settings():
+    """Build the posting schedule from the saved settings.
+
+    The first post is due one pre-generation lead window from now, so it is
+    prepared ahead of time like every later one.
+    """
+    settings = Settings(
+        interval_minutes=services.settings_service.get_setting('interval_minutes', 60),
+        bot_persona=services.settings_service.get_setting('bot_persona', 'neutral news reporter'),
+    )
+    settings.next_post_time = datetime.now() + services.pregeneration_service.lead_time()
+    return settings
+
+async def load_current_settings():
+    """Load the shared schedule so a new leader continues the previous one's slots."""
+    settings = current_settings or build_current_settings()
+    schedule = await services.coordinator.load_schedule()
+    if schedule and schedule["next_post_time"]:
+        settings.last_post_time = schedule["last_post_time"]
+        settings.next_post_time = schedule["next_post_time"]
+        if not services.twitter_service.last_tweet_id:
+            services.twitter_service.last_tweet_id = schedule["last_tweet_id"]
+    else:
+        await save_current_settings(settings)
+    return settings
+
+async def save_current_settings(settings):
+    await services.coordinator.save_schedule({
+        "last_post_time": settings.last_post_time,
+        "next_post_time": settings.next_post_time,
+        "last_tweet_id": services.twitter_service.last_tweet_id,
+    })
+
+async def broadcast_stats():
+    """Fetch engagement stats once on the leader and share them with every worker."""
+    stats = await services.twitter_service.get_latest_stats()
+    await services.coordinator.publish("updates", {"type": "stats_update", "data": stats})
+
+def refresh_current_settings():
+    """Pick up interval and persona changes saved from the dashboard."""
+    current_settings.interval_minutes = services.settings_service.get_setting(
+        'interval_minutes', current_settings.interval_minutes
+    )
+    current_settings.bot_persona = services.settings_service.get_setting(
+        'bot_persona', current_settings.bot_persona
+    )
+
 async def news_bot_loop():
     global current_settings
-    while True:
+    pregeneration_service = services.pregeneration_service
+    twitter_service = services.twitter_service
+    last_stats_time = None
+    while not services.stopping.is_set():
         try:
+            poll_seconds = 60
+            if not services.coordinator.is_leader:
+                # Another replica runs the scheduler, wait for its lease to lapse
+                await services.wait_stopping(services.coordinator.lease_seconds / 3)
+                continue
+
+            current_settings = await load_current_settings()
+            refresh_current_settings()
+
+            if not last_stats_time or (datetime.now() - last_stats_time).total_seconds() >= STATS_INTERVAL:
+                last_stats_time = datetime.now()
+                await broadcast_stats()
+
             if current_settings and current_settings.next_post_time:
                 now = datetime.now()
-                if now >= current_settings.next_post_time:
-                    # Fetch latest news
-                    news_items = await news_service.get_latest_news()
-                    if news_items:
-                        # Generate summary with custom persona
-                        prompt = f"""As a {current_settings.bot_persona}, summarize the following news:
-                        {news_items[0]['title']}
-                        {news_items[0]['excerpt']}
-                        """
-                        summary = await ai_service.generate_summary(news_items)
-                        
-                        # Post to Twitter
-                        tweet = await twitter_service.post_tweet(summary, news_items[0]["link"])
-                        if tweet:
-                            print(f"Posted tweet: {summary}")
-                            current_settings.update_post_times()
+                next_post_time = current_settings.next_post_time
+                if now >= next_post_time:
+                    # Publish the pre-generated candidate (generated inline if missing)
+                    candidate = await pregeneration_service.get(next_post_time)
+                    summary = candidate["summary"] if candidate else None
+                    if candidate:
+                        # Shutdown waits for this block instead of cutting a thread in half
+                        async with services.posting():
+                            if services.stopping.is_set():
+                                break
+                            if not await services.coordinator.renew():
+                                logger.warning("Lost scheduler lease before posting, skipping")
+                                continue
+                            if await publish(candidate):
+                                pregeneration_service.discard(next_post_time)
+                                print(f"Posted tweet: {summary}")
+                                current_settings.update_post_times()
+                                await save_current_settings(current_settings)
                     
                     # Check for new comments and generate responses
-                    if twitter_service.last_tweet_id:
-                        comments = await twitter_service.get_comments(twitter_service.last_tweet_id)
+                    if summary and twitter_service.last_tweet_id:
+                        comments = await services.twitter_service.get_comments(twitter_service.last_tweet_id)
                         for comment in comments:
-                            response = await ai_service.generate_comment(
+                            response = await services.ai_service.generate_comment(
                                 tweet_content=summary,
                                 existing_comments=[c["text"] for c in comments]
                             )
-                            await twitter_service.reply_to_tweet(comment["id"], response)
+                            await services.twitter_service.reply_to_tweet(comment["id"], response)
+                elif pregeneration_service.in_lead_window(next_post_time, now):
+                    # Prepare or refresh the next post ahead of the deadline, off the loop
+                    pregeneration_service.start_refresh(next_post_time)
+
+                poll_seconds = pregeneration_service.seconds_until_next_check(
+                    current_settings.next_post_time, poll_seconds
+                )
+                await services.coordinator.publish("updates", {
+                    "type": "next_post_update",
+                    "data": {
+                        "next_post": current_settings.next_post_time.isoformat(),
+                        "last_post": current_settings.last_post_time.isoformat() if current_settings.last_post_time else None
+                    }
+                })
             
-            # Check every minute
-            await asyncio.sleep(60)
+            # Check every minute, or sooner when the next post is due
+            await services.wait_stopping(poll_seconds)
         except Exception as e:
             print(f"Error in news bot loop: {e}")
-            await asyncio.sleep(300)  # Wait 5 minutes before retrying
+            await services.wait_stopping(300)  # Wait 5 minutes before retrying
+
+async def warm_up():
+    """Import SQLAlchemy, read settings and build clients after the server is accepting connections."""
+    database = await asyncio.to_thread(importlib.import_module, "database")
+    await services.warm_up()
+    await database.init_db()
+
+    services.coordinator.subscribe("terminal", forward_terminal_message)
+    services.coordinator.subscribe("updates", store_shared_update)
+    services.coordinator.subscribe("settings", apply_shared_settings)
+    await services.start()
+    # Background task for news gathering and posting
+    if services.settings_service.get_setting('scheduler_enabled', True):
+        services.start_task(news_bot_loop, name="news_bot_loop")
+    services.ready = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup returns immediately, readiness turns on once warm-up is done
+    services.start_task(warm_up, name="warm_up")
+    try:
+        yield
+    finally:
+        await services.stop()
+        for connection in list(terminal_connections):
+            try:
+                await connection.close()
+            except Exception:
+                pass
+        terminal_connections.clear()
+        if "database" in sys.modules:
+            from database import close_db
+            await close_db()
+
+app = FastAPI(lifespan=lifespan)
+app.mount("/static", StaticFiles(directory="/app/static"), name="static")
+templates = Jinja2Templates(directory="/app/templates")
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and no background task crashed."""
+    if services.is_alive():
+        return {"status": "alive"}
+    return JSONResponse({"status": "dead"}, status_code=503)
 
-@app.on_event("startup")
-async def startup_event():
-    await init_db()
+@app.get("/health/leader")
+async def leader_status():
+    """Whether this worker currently holds the scheduler lease."""
+    if not services.is_built('coordinator'):
+        return {"owner": None, "leader": False}
+    return {"owner": services.coordinator.owner, "leader": services.coordinator.is_leader}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: services are started and not shutting down."""
+    if services.ready and not services.stopping.is_set():
+        return {"status": "ready"}
+    return JSONResponse({"status": "not ready"}, status_code=503)
 
 @app.get("/")
 async def root(request: Request):
@@ -99,23 +266,14 @@ async def root(request: Request):
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     try:
-        while True:
-            # Send real-time updates about news and Twitter stats
-            stats = await twitter_service.get_latest_stats()
-            await websocket.send_json({
-                "type": "stats_update",
-                "data": stats
-            })
+        while not services.stopping.is_set():
+            # Send real-time updates about Twitter stats, as broadcast by the scheduler leader
+            if "stats_update" in shared_updates:
+                await websocket.send_json(shared_updates["stats_update"])
             
-            # Send next post time if available
-            if current_settings and current_settings.next_post_time:
-                await websocket.send_json({
-                    "type": "next_post_update",
-                    "data": {
-                        "next_post": current_settings.next_post_time.isoformat(),
-                        "last_post": current_settings.last_post_time.isoformat() if current_settings.last_post_time else None
-                    }
-                })
+            # Send next post time if available, as broadcast by the scheduler leader
+            if "next_post_update" in shared_updates:
+                await websocket.send_json(shared_updates["next_post_update"])
             
             await asyncio.sleep(30)
     except Exception as e:
@@ -125,28 +283,33 @@ async def websocket_endpoint(websocket: WebSocket):
 
 @app.get("/api/news")
 async def get_news():
-    return await news_service.get_latest_news()
+    return await services.news_service.get_latest_news()
 
 @app.get("/api/twitter/stats")
 async def get_twitter_stats():
-    return await twitter_service.get_latest_stats()
+    """Latest stats broadcast by the scheduler leader, any worker can answer."""
+    if "stats_update" in shared_updates:
+        return shared_updates["stats_update"]["data"]
+    return {"tweet_id": None, "likes": 0, "retweets": 0, "replies": 0, "views": 0}
 
 @app.get("/api/settings")
 async def get_settings():
     """Get all settings."""
-    return settings_service.get_all_settings()
+    return services.settings_service.get_all_settings()
 
 @app.post("/api/settings")
 async def update_settings(settings: dict):
     """Update settings."""
-    if settings_service.save_settings(settings):
+    if services.settings_service.save_settings(settings):
+        # Every worker, the scheduler leader in particular, keeps settings in memory
+        await services.coordinator.publish("settings", {"settings": settings})
         return {"status": "success", "settings": settings}
     return {"status": "error", "message": "Failed to save settings"}
 
 @app.post("/api/twitter/validate")
 async def validate_twitter_credentials():
     """Validate Twitter API credentials."""
-    return twitter_service.validate_credentials()
+    return services.twitter_service.validate_credentials()
 
 @app.post("/api/twitter/tweet")
 async def post_tweet(request: Request):
@@ -155,8 +318,13 @@ async def post_tweet(request: Request):
         text = data.get("text")
         if not text:
             return JSONResponse({"error": "Tweet text is required"}, status_code=400)
+        length = weighted_length(text)
+        if length > MAX_WEIGHTED_LENGTH:
+            return JSONResponse({
+                "error": f"Tweet is {length} characters, the limit is {MAX_WEIGHTED_LENGTH}"
+            }, status_code=400)
         
-        result = await twitter_service.post_tweet(text)
+        result = await services.twitter_service.post_tweet(text)
         return JSONResponse(result)
     except Exception as e:
         logger.error(f"Error posting tweet: {str(e)}")
@@ -167,7 +335,7 @@ async def get_ai_summary(query: str = ''):
     """Get AI-generated summary of news articles."""
     try:
         # Fetch news based on query
-        news_items = await news_service.fetch_news(query)
+        news_items = await services.news_service.fetch_news(query)
         
         if not news_items:
             return JSONResponse({
@@ -187,30 +355,31 @@ async def get_ai_summary(query: str = ''):
 Please provide a concise summary of these articles, highlighting the key points and trends."""
 
         # Get AI summary using settings
-        ollama_host = settings_service.get_setting('ollama_host', 'http://host.docker.internal:11434')
-        model_name = settings_service.get_setting('model_name', 'llama2')
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{ollama_host}/api/generate",
-                json={
-                    "model": model_name,
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
+        ollama_host = services.settings_service.get_setting('ollama_host', 'http://host.docker.internal:11434')
+        model_name = services.settings_service.get_setting('model_name', 'llama2')
+
+        client = await services.ai_service.get_session()
+        response = await client.post(
+            f"{ollama_host}/api/generate",
+            timeout=30.0,
+            json={
+                "model": model_name,
+                "prompt": prompt,
+                "stream": False
+            }
+        )
             
-            if response.status_code != 200:
-                logger.error(f"Ollama API error: {response.text}")
-                return JSONResponse({"error": "Failed to generate summary"}, status_code=500)
+        if response.status_code != 200:
+            logger.error(f"Ollama API error: {response.text}")
+            return JSONResponse({"error": "Failed to generate summary"}, status_code=500)
 
-            result = response.json()
-            summary = result.get("response", "").strip()
+        result = response.json()
+        summary = result.get("response", "").strip()
 
-            return JSONResponse({
-                "summary": summary,
-                "news_items": news_items
-            })
+        return JSONResponse({
+            "summary": summary,
+            "news_items": news_items
+        })
 
     except Exception as e:
         logger.error(f"Error getting AI summary: {str(e)}")
@@ -220,13 +389,13 @@ Please provide a concise summary of these articles, highlighting the key points
 async def get_available_models():
     """Get available models from Ollama server."""
     try:
-        ollama_host = settings_service.get_setting('ollama_host', 'http://host.docker.internal:11434')
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{ollama_host}/api/tags")
-            if response.status_code == 200:
-                models = response.json().get("models", [])
-                return {"models": [model["name"] for model in models]}
-            return {"error": f"Failed to fetch models: {response.text}"}
+        ollama_host = services.settings_service.get_setting('ollama_host', 'http://host.docker.internal:11434')
+        client = await services.ai_service.get_session()
+        response = await client.get(f"{ollama_host}/api/tags")
+        if response.status_code == 200:
+            models = response.json().get("models", [])
+            return {"models": [model["name"] for model in models]}
+        return {"error": f"Failed to fetch models: {response.text}"}
     except Exception as e:
         logger.error(f"Error fetching models: {str(e)}")
         return {"error": str(e)}
@@ -241,10 +410,6 @@ async def terminal_updates(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Terminal WebSocket error: {e}")
     finally:
-        terminal_connections.remove(websocket)
+        if websocket in terminal_connections:
+            terminal_connections.remove(websocket)
         await websocket.close()
-
-# Background task for news gathering and posting
-@app.on_event("startup")
-async def start_news_bot():
-    asyncio.create_task(news_bot_loop())
@@ -6,6 +6,17 @@ class AIService:
     def __init__(self):
         self.ollama_url = "http://ollama:11434"
         self.model = "mistral"  # You can change this to any model you have in Ollama
+        self.session = None
+
+    async def get_session(self):
+        if self.session is None:
+            self.session = httpx.AsyncClient(timeout=120.0)
+        return self.session
+
+    async def close(self):
+        if self.session:
+            await self.session.aclose()
+            self.session = None
 
     async def generate_summary(self, news_items: List[Dict]) -> str:
         try:
@@ -13,7 +24,7 @@ class AIService:
             news_text = "\n\n".join([
                 f"Title: {item['title']}\n"
                 f"Source: {item['source']}\n"
-                f"Content: {item['excerpt']}"
+                f"Content: {item.get('excerpt', item.get('body', ''))}"
                 for item in news_items
             ])
 
@@ -24,22 +35,47 @@ class AIService:
                 "Include a brief commentary on the most significant story."
             )
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False
-                    }
-                )
-                result = response.json()
-                return result['response'].strip()
+            client = await self.get_session()
+            response = await client.post(
+                f"{self.ollama_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False
+                }
+            )
+            result = response.json()
+            return result['response'].strip()
 
         except Exception as e:
             print(f"Error generating summary: {e}")
             return ""
 
+    async def shorten_summary(self, summary: str, max_chars: int) -> str:
+        try:
+            prompt = (
+                f"Rewrite the following Twitter post in at most {max_chars} characters. "
+                "Keep the most important facts and drop the rest. "
+                "Reply with the rewritten post only:\n\n"
+                f"{summary}"
+            )
+
+            client = await self.get_session()
+            response = await client.post(
+                f"{self.ollama_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False
+                }
+            )
+            result = response.json()
+            return result['response'].strip()
+
+        except Exception as e:
+            print(f"Error shortening summary: {e}")
+            return ""
+
     async def generate_comment(self, tweet_content: str, existing_comments: List[str]) -> str:
         try:
             prompt = (
@@ -51,17 +87,17 @@ class AIService:
                 "Keep it concise and respectful."
             )
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False
-                    }
-                )
-                result = response.json()
-                return result['response'].strip()
+            client = await self.get_session()
+            response = await client.post(
+                f"{self.ollama_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False
+                }
+            )
+            result = response.json()
+            return result['response'].strip()
 
         except Exception as e:
             print(f"Error generating comment: {e}")
@@ -75,17 +111,17 @@ class AIService:
                 f"{text}"
             )
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "stream": False
-                    }
-                )
-                result = response.json()
-                return json.loads(result['response'])
+            client = await self.get_session()
+            response = await client.post(
+                f"{self.ollama_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": prompt,
+                    "stream": False
+                }
+            )
+            result = response.json()
+            return json.loads(result['response'])
 
         except Exception as e:
             print(f"Error analyzing sentiment: {e}")
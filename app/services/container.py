@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from functools import cached_property
+from typing import Callable, Coroutine, List
+
+logger = logging.getLogger(__name__)
+
+class ServiceContainer:
+    """Own the services, their HTTP clients and the background tasks of the app.
+
+    Started and stopped from the FastAPI lifespan so that nothing outlives the
+    process (or a --reload cycle). Services and their dependencies are imported
+    and built on first access, so creating the container is cheap.
+    """
+
+    def __init__(self):
+        self.tasks: List[asyncio.Task] = []
+        self.ready = False
+        self.stopping = asyncio.Event()
+        self._posting_lock = asyncio.Lock()
+
+    @cached_property
+    def settings_service(self):
+        from services.settings_service import SettingsService
+        return SettingsService()
+
+    @cached_property
+    def news_service(self):
+        from services.news_service import NewsService
+        return NewsService(self.settings_service)
+
+    @cached_property
+    def ai_service(self):
+        from services.ai_service import AIService
+        return AIService()
+
+    @cached_property
+    def twitter_service(self):
+        from services.twitter_service import TwitterService
+        return TwitterService(self.settings_service)
+
+    @cached_property
+    def tweet_composer(self):
+        from services.tweet_composer import TweetComposer
+        return TweetComposer(self.settings_service, self.ai_service)
+
+    @cached_property
+    def pregeneration_service(self):
+        from services.pregeneration_service import PreGenerationService
+        return PreGenerationService(
+            self.settings_service, self.news_service, self.ai_service, self.tweet_composer
+        )
+
+    @cached_property
+    def coordinator(self):
+        from services.coordination import Coordinator
+        return Coordinator.from_settings(self.settings_service)
+
+    def is_built(self, name: str) -> bool:
+        """Check whether a lazily built service exists yet."""
+        return name in self.__dict__
+
+    def start_task(self, factory: Callable[[], Coroutine], name: str) -> asyncio.Task:
+        """Run a background coroutine and keep a reference to it."""
+        task = asyncio.create_task(factory(), name=name)
+        self.tasks.append(task)
+        return task
+
+    def is_alive(self) -> bool:
+        """Check that no background task died unexpectedly."""
+        return not any(
+            task.done() and not task.cancelled() and task.exception() is not None
+            for task in self.tasks
+        )
+
+    async def wait_stopping(self, timeout: float) -> bool:
+        """Sleep for timeout seconds, returning early (True) when shutdown starts."""
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    @asynccontextmanager
+    async def posting(self):
+        """Mark a post as in flight so shutdown waits for it to finish."""
+        async with self._posting_lock:
+            yield
+
+    async def start(self):
+        self.stopping.clear()
+        # Every worker serves the API, only the lease holder runs the scheduler
+        await self.coordinator.renew()
+        self.start_task(lambda: self.coordinator.run_election(self.stopping), name="leader_election")
+        self.start_task(lambda: self.coordinator.run_dispatcher(self.stopping), name="pubsub_dispatcher")
+        logger.info("Services started")
+
+    async def warm_up(self):
+        """Build the services and clients in a worker thread once the server is up.
+
+        Importing SQLAlchemy, httpx and tweepy and reading settings.json are
+        blocking, so they stay off the event loop that is already serving requests.
+        """
+        await asyncio.to_thread(self._build_services)
+
+    def _build_services(self):
+        self.coordinator
+        self.pregeneration_service
+        self.twitter_service.ensure_client()
+
+    async def stop(self):
+        """Stop background tasks, letting an in-flight post finish first."""
+        self.ready = False
+        self.stopping.set()
+
+        drain_seconds = 60
+        if self.is_built('settings_service'):
+            drain_seconds = self.settings_service.get_setting('shutdown_drain_seconds', 60)
+        drained = False
+        try:
+            # Holding the lock also keeps the loop from starting a new post
+            await asyncio.wait_for(self._posting_lock.acquire(), timeout=drain_seconds)
+            drained = True
+        except asyncio.TimeoutError:
+            logger.warning(f"In-flight post did not finish within {drain_seconds}s, cancelling")
+
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+
+        # Hand the scheduler over to another replica right away
+        if self.is_built('coordinator'):
+            await self.coordinator.resign()
+            await self.coordinator.drain()
+
+        if self.is_built('pregeneration_service'):
+            await self.pregeneration_service.close()
+        if self.is_built('news_service'):
+            await self.news_service.close()
+        if self.is_built('ai_service'):
+            await self.ai_service.close()
+        if drained:
+            self._posting_lock.release()
+        logger.info("Services stopped")
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from database import AsyncSessionLocal, Lease, Message, Schedule
+
+logger = logging.getLogger(__name__)
+
+LEADER_LEASE = "news_bot_scheduler"
+
+SCHEDULE_FIELDS = ("last_post_time", "next_post_time", "last_tweet_id")
+
+class LeaseBackend(ABC):
+    """Storage for named leases held by one owner until they expire.
+
+    Also keeps the state guarded by a lease (the posting schedule), so a new
+    leader carries on where the previous one stopped.
+    """
+
+    @abstractmethod
+    async def acquire(self, name: str, owner: str, ttl_seconds: int) -> bool:
+        """Take or renew the lease; False if another owner holds it."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release(self, name: str, owner: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def load_schedule(self, name: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_schedule(self, name: str, schedule: Dict) -> None:
+        raise NotImplementedError
+
+class PubSubBackend(ABC):
+    """Channel shared by every worker for broadcast messages."""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Dict) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def poll(self) -> List[Tuple[str, Dict]]:
+        """Wait for and return the messages published since the last poll."""
+        raise NotImplementedError
+
+class SQLiteLeaseBackend(LeaseBackend):
+    """Leases in the app database, shared by every process using the same file."""
+
+    async def acquire(self, name: str, owner: str, ttl_seconds: int) -> bool:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Lease)
+                .where(Lease.name == name, or_(Lease.owner == owner, Lease.expires_at < now))
+                .values(owner=owner, expires_at=expires_at)
+            )
+            if result.rowcount == 0:
+                session.add(Lease(name=name, owner=owner, expires_at=expires_at))
+            try:
+                await session.commit()
+            except IntegrityError:
+                # Someone else holds an unexpired lease
+                await session.rollback()
+                return False
+            return True
+
+    async def release(self, name: str, owner: str) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Lease).where(Lease.name == name, Lease.owner == owner))
+            await session.commit()
+
+    async def load_schedule(self, name: str) -> Optional[Dict]:
+        async with AsyncSessionLocal() as session:
+            row = await session.get(Schedule, name)
+            if row is None:
+                return None
+            return {field: getattr(row, field) for field in SCHEDULE_FIELDS}
+
+    async def save_schedule(self, name: str, schedule: Dict) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.merge(Schedule(name=name, **{field: schedule.get(field) for field in SCHEDULE_FIELDS}))
+            await session.commit()
+
+class SQLitePubSub(PubSubBackend):
+    """Messages table polled by every process; old rows are pruned as we go."""
+
+    def __init__(self, poll_interval: float = 1.0, retention_seconds: int = 300):
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.last_id: Optional[int] = None
+        self.polls = 0
+
+    async def publish(self, channel: str, message: Dict) -> None:
+        async with AsyncSessionLocal() as session:
+            session.add(Message(channel=channel, payload=json.dumps(message)))
+            await session.commit()
+
+    async def poll(self) -> List[Tuple[str, Dict]]:
+        await asyncio.sleep(self.poll_interval)
+        async with AsyncSessionLocal() as session:
+            if self.last_id is None:
+                # Only deliver messages published after we subscribed
+                self.last_id = (await session.execute(select(func.max(Message.id)))).scalar() or 0
+                return []
+
+            rows = (await session.execute(
+                select(Message).where(Message.id > self.last_id).order_by(Message.id)
+            )).scalars().all()
+            if rows:
+                self.last_id = rows[-1].id
+
+            self.polls += 1
+            if self.polls % 60 == 0:
+                cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+                # Keep the newest row: tables created before AUTOINCREMENT would
+                # otherwise restart ids at 1 once empty
+                newest = select(func.max(Message.id)).scalar_subquery()
+                await session.execute(
+                    delete(Message).where(Message.created_at < cutoff, Message.id < newest)
+                )
+                await session.commit()
+
+            return [(row.channel, json.loads(row.payload)) for row in rows]
+
+class InMemoryLeaseBackend(LeaseBackend):
+    """Single-process stand-in for local development."""
+
+    def __init__(self):
+        self.leases: Dict[str, Tuple[str, datetime]] = {}
+        self.schedules: Dict[str, Dict] = {}
+
+    async def acquire(self, name: str, owner: str, ttl_seconds: int) -> bool:
+        now = datetime.utcnow()
+        holder = self.leases.get(name)
+        if holder and holder[0] != owner and holder[1] >= now:
+            return False
+        self.leases[name] = (owner, now + timedelta(seconds=ttl_seconds))
+        return True
+
+    async def release(self, name: str, owner: str) -> None:
+        holder = self.leases.get(name)
+        if holder and holder[0] == owner:
+            del self.leases[name]
+
+    async def load_schedule(self, name: str) -> Optional[Dict]:
+        schedule = self.schedules.get(name)
+        return dict(schedule) if schedule else None
+
+    async def save_schedule(self, name: str, schedule: Dict) -> None:
+        self.schedules[name] = {field: schedule.get(field) for field in SCHEDULE_FIELDS}
+
+class InMemoryPubSub(PubSubBackend):
+    """Single-process stand-in for local development."""
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def publish(self, channel: str, message: Dict) -> None:
+        await self.queue.put((channel, message))
+
+    async def poll(self) -> List[Tuple[str, Dict]]:
+        messages = [await self.queue.get()]
+        while not self.queue.empty():
+            messages.append(self.queue.get_nowait())
+        return messages
+
+BACKENDS = {
+    "sqlite": (SQLiteLeaseBackend, SQLitePubSub),
+    "memory": (InMemoryLeaseBackend, InMemoryPubSub),
+}
+
+class Coordinator:
+    """Leader election for the scheduler and message broadcast between workers."""
+
+    def __init__(self, lease_backend: LeaseBackend, pubsub: PubSubBackend, lease_seconds: int = 30):
+        self.lease_backend = lease_backend
+        self.pubsub = pubsub
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.handlers: Dict[str, List[Callable[[Dict], Awaitable[None]]]] = defaultdict(list)
+        self._pending: set = set()
+
+    @classmethod
+    def from_settings(cls, settings_service) -> "Coordinator":
+        backend = settings_service.get_setting('coordination_backend', 'sqlite')
+        if backend not in BACKENDS:
+            logger.warning(f"Unknown coordination backend '{backend}', using sqlite")
+            backend = 'sqlite'
+        lease_cls, pubsub_cls = BACKENDS[backend]
+        lease_seconds = settings_service.get_setting('leader_lease_seconds', 30)
+        return cls(lease_cls(), pubsub_cls(), lease_seconds)
+
+    async def renew(self) -> bool:
+        """Acquire or renew the scheduler lease and return whether we lead."""
+        try:
+            leader = await self.lease_backend.acquire(LEADER_LEASE, self.owner, self.lease_seconds)
+        except Exception as e:
+            logger.error(f"Error renewing leader lease: {e}")
+            leader = False
+        if leader != self.is_leader:
+            logger.info(f"{self.owner} {'became' if leader else 'is no longer'} the scheduler leader")
+        self.is_leader = leader
+        return leader
+
+    async def resign(self) -> None:
+        if self.is_leader:
+            self.is_leader = False
+            try:
+                await self.lease_backend.release(LEADER_LEASE, self.owner)
+            except Exception as e:
+                logger.error(f"Error releasing leader lease: {e}")
+
+    async def load_schedule(self) -> Optional[Dict]:
+        """Shared posting schedule, None until a leader saved one."""
+        return await self.lease_backend.load_schedule(LEADER_LEASE)
+
+    async def save_schedule(self, schedule: Dict) -> None:
+        await self.lease_backend.save_schedule(LEADER_LEASE, schedule)
+
+    async def run_election(self, stopping: asyncio.Event) -> None:
+        """Renew the lease well before it expires until shutdown."""
+        while not stopping.is_set():
+            await self.renew()
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=self.lease_seconds / 3)
+            except asyncio.TimeoutError:
+                pass
+
+    def subscribe(self, channel: str, handler: Callable[[Dict], Awaitable[None]]) -> None:
+        self.handlers[channel].append(handler)
+
+    async def publish(self, channel: str, message: Dict) -> None:
+        try:
+            await self.pubsub.publish(channel, message)
+        except Exception as e:
+            logger.error(f"Error publishing to {channel}: {e}")
+
+    def publish_nowait(self, channel: str, message: Dict) -> None:
+        """Publish from synchronous code running inside the event loop."""
+        task = asyncio.get_running_loop().create_task(self.publish(channel, message))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def drain(self) -> None:
+        """Wait for messages still being published."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def run_dispatcher(self, stopping: asyncio.Event) -> None:
+        """Deliver messages from the shared channel to local subscribers."""
+        while not stopping.is_set():
+            try:
+                messages = await self.pubsub.poll()
+            except Exception as e:
+                logger.error(f"Error polling messages: {e}")
+                await asyncio.sleep(5)
+                continue
+            for channel, message in messages:
+                for handler in self.handlers.get(channel, []):
+                    try:
+                        await handler(message)
+                    except Exception as e:
+                        logger.error(f"Error handling {channel} message: {e}")
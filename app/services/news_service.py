@@ -5,7 +5,6 @@ from typing import List, Dict, Optional
 import asyncio
 import time
 import json
-from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
@@ -77,6 +76,8 @@ class NewsService:
             if response.status_code != 200:
                 return []
             
+            # Imported here, BeautifulSoup and lxml are only needed for this fallback
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(response.text, 'xml')
             items = soup.find_all('item')
             
@@ -134,10 +135,17 @@ class NewsService:
             logger.error(f"Error fetching news: {str(e)}")
             return []
 
+    async def get_latest_news(self) -> List[Dict]:
+        """Fetch the newest articles, capped at the max_news_items setting."""
+        max_items = self.settings_service.get_setting('max_news_items', 5)
+        articles = await self.fetch_news()
+        return articles[:max_items]
+
     async def search_internet(self, query):
         """Legacy method - now redirects to fetch_news"""
         return await self.fetch_news(query)
 
-    async def __del__(self):
+    async def close(self):
         if self.session:
             await self.session.aclose()
+            self.session = None
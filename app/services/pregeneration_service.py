@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class PreGenerationService:
+    """Prepare the next post during a lead window before it is due."""
+
+    def __init__(self, settings_service, news_service, ai_service, tweet_composer):
+        self.settings_service = settings_service
+        self.news_service = news_service
+        self.ai_service = ai_service
+        self.tweet_composer = tweet_composer
+        self.candidate: Optional[Dict] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def lead_time(self) -> timedelta:
+        """How long before next_post_time the candidate starts being prepared."""
+        minutes = self.settings_service.get_setting('pregeneration_lead_minutes', 5)
+        return timedelta(minutes=minutes)
+
+    def in_lead_window(self, next_post_time: datetime, now: Optional[datetime] = None) -> bool:
+        """Check if we are inside the lead window but not yet past the deadline."""
+        now = now or datetime.now()
+        return next_post_time - self.lead_time() <= now < next_post_time
+
+    def validate_summary(self, summary: str) -> bool:
+        """Check that a generated summary is usable as a post."""
+        return bool(summary and summary.strip())
+
+    def _is_current(self, next_post_time: datetime, news_items: List[Dict]) -> bool:
+        """Check if the candidate was built for this slot from the newest article."""
+        if not self.candidate or self.candidate['next_post_time'] != next_post_time:
+            return False
+        return self.candidate['link'] == news_items[0].get('link')
+
+    async def prepare(self, next_post_time: datetime) -> Optional[Dict]:
+        """Build or refresh the candidate for the given slot.
+
+        The LLM is only called again when the newest article changed since the
+        current candidate was generated.
+        """
+        async with self._lock:
+            news_items = await self.news_service.get_latest_news()
+            if not news_items:
+                logger.warning("No news available for pre-generation")
+                return self.candidate
+
+            if self._is_current(next_post_time, news_items):
+                return self.candidate
+
+            summary = await self.ai_service.generate_summary(news_items)
+            if not self.validate_summary(summary):
+                logger.warning("Pre-generated summary failed validation, keeping previous candidate")
+                return self.candidate
+
+            link = news_items[0].get('link')
+            self.candidate = {
+                "summary": summary,
+                "tweets": await self.tweet_composer.compose(summary, link),
+                "link": link,
+                "news_items": news_items,
+                "next_post_time": next_post_time,
+                "generated_at": datetime.now(),
+            }
+            logger.info(f"Prepared post candidate for {next_post_time.isoformat()}")
+            return self.candidate
+
+    def refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    def start_refresh(self, next_post_time: datetime) -> None:
+        """Prepare or refresh the candidate in the background.
+
+        The loop keeps its pace, so a refresh that is still generating when the
+        deadline hits doesn't hold back the candidate that is already ready.
+        """
+        if not self.refreshing():
+            self._refresh_task = asyncio.create_task(
+                self._refresh(next_post_time), name="pregeneration_refresh"
+            )
+
+    async def _refresh(self, next_post_time: datetime) -> None:
+        try:
+            await self.prepare(next_post_time)
+        except Exception as e:
+            logger.error(f"Error pre-generating post: {e}")
+
+    async def close(self) -> None:
+        """Cancel a refresh still running."""
+        if self.refreshing():
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+        self._refresh_task = None
+
+    def _matches(self, next_post_time: datetime) -> bool:
+        return bool(self.candidate) and self.candidate['next_post_time'] == next_post_time
+
+    async def get(self, next_post_time: datetime) -> Optional[Dict]:
+        """Return the candidate for this slot without clearing it.
+
+        A ready candidate is returned right away and any refresh still running
+        is cancelled. Otherwise a running refresh is awaited, falling back to
+        generating inline when nothing was prepared in time. The candidate stays
+        in place until discard(), so a failed post is retried with the same
+        tweets instead of a fresh generation.
+        """
+        if self._matches(next_post_time):
+            await self.close()
+            return self.candidate
+
+        if self.refreshing():
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+        if not self._matches(next_post_time):
+            await self.prepare(next_post_time)
+        return self.candidate if self._matches(next_post_time) else None
+
+    def discard(self, next_post_time: datetime) -> None:
+        """Drop the candidate once its slot has been posted."""
+        if self._matches(next_post_time):
+            self.candidate = None
+
+    def seconds_until_next_check(self, next_post_time: datetime, poll_seconds: int = 60) -> float:
+        """Sleep no longer than the time left before the deadline."""
+        remaining = (next_post_time - datetime.now()).total_seconds()
+        if remaining <= 0:
+            # Overdue slot (e.g. a failed post), retry at the normal pace
+            return poll_seconds
+        return max(1.0, min(poll_seconds, remaining))
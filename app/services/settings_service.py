@@ -8,7 +8,8 @@ logger = logging.getLogger(__name__)
 
 class SettingsService:
     def __init__(self):
-        self.config_dir = Path(__file__).parent.parent / "config"
+        # NEWS_BOT_CONFIG_DIR lets a separate instance (e.g. the startup benchmark) use its own settings
+        self.config_dir = Path(os.environ.get("NEWS_BOT_CONFIG_DIR", Path(__file__).parent.parent / "config"))
         self.settings_file = self.config_dir / "settings.json"
         self.settings = self.load_settings()
 
@@ -25,7 +26,15 @@ class SettingsService:
                     "model_name": "llama3.2",
                     "available_models": ["llama3.2", "mistral", "llama2"],
                     "news_refresh_interval": 30,
-                    "max_news_items": 5
+                    "max_news_items": 5,
+                    "interval_minutes": 60,
+                    "bot_persona": "neutral news reporter",
+                    "pregeneration_lead_minutes": 5,
+                    "max_thread_tweets": 3,
+                    "shutdown_drain_seconds": 60,
+                    "coordination_backend": "sqlite",
+                    "leader_lease_seconds": 30,
+                    "scheduler_enabled": True
                 }
                 self.save_settings(default_settings)
                 return default_settings
@@ -47,6 +56,10 @@ class SettingsService:
             logger.error(f"Error saving settings: {e}")
             return False
 
+    def apply_settings(self, settings):
+        """Use settings saved by another worker without writing the file again."""
+        self.settings = settings
+
     def get_setting(self, key, default=None):
         """Get a specific setting value."""
         return self.settings.get(key, default)
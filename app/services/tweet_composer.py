@@ -0,0 +1,177 @@
+import logging
+import re
+import unicodedata
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Twitter counting rules (twitter-text v3 config)
+MAX_WEIGHTED_LENGTH = 280
+TRANSFORMED_URL_LENGTH = 23  # every URL is wrapped by t.co
+WEIGHT_SCALE = 100
+DEFAULT_WEIGHT = 200
+LIGHT_WEIGHT_RANGES = [
+    (0, 4351, 100),        # Latin-1 through Hangul Jamo
+    (8192, 8205, 100),     # General punctuation spaces
+    (8208, 8223, 100),     # Dashes and quotes
+    (8242, 8247, 100),     # Primes
+]
+
+COUNTER_RESERVE = 8  # room for a " (10/10)" thread counter
+
+# twitter-text also links scheme-less domains: any generic TLD, or a country
+# code TLD when followed by a path (".co" is linked on its own)
+GENERIC_TLDS = (
+    "com|org|net|edu|gov|mil|int|info|biz|name|pro|aero|coop|museum|mobi|asia|"
+    "tel|travel|jobs|cat|xxx|app|dev|io|ai|news|blog|online|site|tech|store|"
+    "xyz|top|live|media|world|today|global|link|club|space|website|co"
+)
+URL_END = r"(?:/[^\s]*[^\s.,!?;:'\")\]])?"
+URL_PATTERN = re.compile(
+    r"https?://[^\s]*[^\s.,!?;:'\")\]]"
+    r"|(?<![\w@.-])(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+"
+    r"(?:(?:" + GENERIC_TLDS + r")(?![\w-])(?::\d+)?" + URL_END +
+    r"|[a-z]{2}(?::\d+)?/[^\s]*[^\s.,!?;:'\")\]])",
+    re.IGNORECASE,
+)
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+|(?<=[。！？])')
+
+def char_weight(char: str) -> int:
+    """Weight of a single code point, in WEIGHT_SCALE units."""
+    code_point = ord(char)
+    for start, end, weight in LIGHT_WEIGHT_RANGES:
+        if start <= code_point <= end:
+            return weight
+    return DEFAULT_WEIGHT
+
+def weighted_length(text: str) -> int:
+    """Length of a tweet as counted by Twitter (URLs count as a t.co link)."""
+    text = unicodedata.normalize('NFC', text)
+    total = 0
+    position = 0
+    for match in URL_PATTERN.finditer(text):
+        total += sum(char_weight(c) for c in text[position:match.start()])
+        total += TRANSFORMED_URL_LENGTH * WEIGHT_SCALE
+        position = match.end()
+    total += sum(char_weight(c) for c in text[position:])
+    return -(-total // WEIGHT_SCALE)
+
+def fits(text: str, limit: int = MAX_WEIGHTED_LENGTH) -> bool:
+    return weighted_length(text) <= limit
+
+class TweetComposer:
+    """Turn an LLM summary into one tweet or a short thread that fits Twitter's limits."""
+
+    def __init__(self, settings_service, ai_service):
+        self.settings_service = settings_service
+        self.ai_service = ai_service
+
+    def max_thread_tweets(self) -> int:
+        return max(1, int(self.settings_service.get_setting('max_thread_tweets', 3)))
+
+    def split_sentences(self, text: str) -> List[str]:
+        return [s.strip() for s in SENTENCE_PATTERN.split(text.strip()) if s.strip()]
+
+    def trim_words(self, text: str, limit: int) -> str:
+        """Cut text at a word boundary so that it fits, adding an ellipsis."""
+        if fits(text, limit):
+            return text
+        words = text.split()
+        while words and not fits(" ".join(words) + "…", limit):
+            words.pop()
+        if words:
+            return " ".join(words) + "…"
+        # A single word longer than the limit, cut it by characters
+        while text and not fits(text + "…", limit):
+            text = text[:-1]
+        return text + "…"
+
+    def trim(self, text: str, limit: int = MAX_WEIGHTED_LENGTH) -> str:
+        """Trim text to the last full sentence that fits within limit."""
+        if fits(text, limit):
+            return text
+        kept = []
+        for sentence in self.split_sentences(text):
+            if not fits(" ".join(kept + [sentence]), limit):
+                break
+            kept.append(sentence)
+        if kept:
+            return " ".join(kept)
+        return self.trim_words(text, limit)
+
+    def _units(self, text: str, limit: int) -> List[str]:
+        """Sentences of text, with any sentence longer than limit broken at word boundaries."""
+        units = []
+        for sentence in self.split_sentences(text):
+            if fits(sentence, limit):
+                units.append(sentence)
+                continue
+            chunk = ""
+            for word in sentence.split():
+                candidate = f"{chunk} {word}".strip()
+                if chunk and not fits(candidate, limit):
+                    units.append(chunk)
+                    candidate = word
+                chunk = candidate
+            if chunk:
+                units.append(self.trim_words(chunk, limit))
+        return units
+
+    def number(self, tweets: List[str]) -> List[str]:
+        """Append a "(i/n)" counter to each tweet of a thread."""
+        if len(tweets) < 2:
+            return tweets
+        total = len(tweets)
+        return [f"{tweet} ({i}/{total})" for i, tweet in enumerate(tweets, start=1)]
+
+    def split_thread(self, text: str, link: Optional[str] = None) -> List[str]:
+        """Split text into tweets at sentence boundaries, without counters.
+
+        The link is attached to the first tweet. Room is left in every tweet
+        for the counter added by number().
+        """
+        text = " ".join(text.split())
+        link_suffix = f" {link}" if link else ""
+        if fits(text + link_suffix):
+            return [text + link_suffix]
+
+        limit = MAX_WEIGHTED_LENGTH - COUNTER_RESERVE
+        first_limit = limit - weighted_length(link_suffix)
+        tweets: List[str] = []
+        current = ""
+        for unit in self._units(text, first_limit):
+            candidate = f"{current} {unit}".strip()
+            if fits(candidate, limit if tweets else first_limit):
+                current = candidate
+                continue
+            tweets.append(current + (link_suffix if not tweets else ""))
+            current = unit
+        if current:
+            tweets.append(current + (link_suffix if not tweets else ""))
+        return tweets
+
+    async def compose(self, summary: str, link: Optional[str] = None) -> List[str]:
+        """Build the tweets for a summary.
+
+        The model is asked for a shorter version only when the summary would
+        not fit in max_thread_tweets tweets; anything still too long after that
+        is trimmed at a sentence boundary.
+        """
+        max_tweets = self.max_thread_tweets()
+        tweets = self.split_thread(summary, link)
+        if len(tweets) <= max_tweets:
+            return self.number(tweets)
+
+        link_length = TRANSFORMED_URL_LENGTH + 1 if link else 0
+        budget = max_tweets * (MAX_WEIGHTED_LENGTH - COUNTER_RESERVE) - link_length
+        logger.info(f"Summary needs {len(tweets)} tweets, asking for a {budget} character version")
+        shorter = await self.ai_service.shorten_summary(summary, budget)
+        if shorter:
+            tweets = self.split_thread(shorter, link)
+            if len(tweets) <= max_tweets:
+                return self.number(tweets)
+            summary = shorter
+
+        logger.warning("Summary still too long after re-generation, trimming to fit")
+        tweets = self.split_thread(self.trim(summary, budget), link)[:max_tweets]
+        return self.number(tweets)
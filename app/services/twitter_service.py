@@ -1,19 +1,33 @@
-import tweepy
-from typing import Optional, Dict
+from typing import TYPE_CHECKING, Optional, Dict, List
+import asyncio
 import logging
 
+if TYPE_CHECKING:
+    import tweepy
+
 logger = logging.getLogger(__name__)
 
 class TwitterService:
     def __init__(self, settings_service):
         self.settings_service = settings_service
-        self.api: Optional[tweepy.API] = None
-        self.client: Optional[tweepy.Client] = None
-        self._initialize_client()
+        self.api: Optional["tweepy.API"] = None
+        self.client: Optional["tweepy.Client"] = None
+        self.last_tweet_id: Optional[str] = None
+        self.user_id: Optional[str] = None
+        self.replied_comment_ids = set()
+        self._initialized = False
+
+    def ensure_client(self):
+        """Initialize the client on first use rather than at import time."""
+        if not self._initialized:
+            self._initialized = True
+            self._initialize_client()
 
     def _initialize_client(self):
         """Initialize Twitter API client with current settings."""
         try:
+            import tweepy
+
             settings = self.settings_service.get_settings()
             twitter_settings = settings.get('twitter', {})
 
@@ -63,6 +77,7 @@ class TwitterService:
                 "message": "Twitter credentials not configured. Please update settings with your Twitter API credentials."
             }
 
+        self.ensure_client()
         try:
             if self.client and self.api:
                 # Test the API by getting the authenticated user
@@ -83,14 +98,15 @@ class TwitterService:
                 "message": f"Twitter API error: {str(e)}"
             }
 
-    async def post_tweet(self, text: str) -> Dict:
-        """Post a tweet."""
+    async def post_tweet(self, text: str, in_reply_to_tweet_id: Optional[str] = None) -> Dict:
+        """Post a tweet, optionally as a reply to another tweet."""
         if not self.is_configured():
             return {
                 "status": "error",
                 "message": "Twitter credentials not configured. Please update settings with your Twitter API credentials."
             }
 
+        self.ensure_client()
         if not self.client:
             return {
                 "status": "error",
@@ -98,12 +114,17 @@ class TwitterService:
             }
 
         try:
-            response = self.client.create_tweet(text=text)
+            # tweepy is blocking and sets no timeout, keep it off the event loop
+            response = await asyncio.to_thread(
+                self.client.create_tweet, text=text, in_reply_to_tweet_id=in_reply_to_tweet_id
+            )
             if response and response.data:
                 tweet_id = response.data['id']
+                self.last_tweet_id = tweet_id
                 return {
                     "status": "success",
                     "message": f"Tweet posted successfully",
+                    "tweet_id": tweet_id,
                     "tweet_url": f"https://twitter.com/user/status/{tweet_id}"
                 }
             return {
@@ -116,3 +137,115 @@ class TwitterService:
                 "status": "error",
                 "message": f"Twitter API error: {str(e)}"
             }
+
+    async def post_thread(self, tweets: List[str]) -> Dict:
+        """Post tweets as a thread, each one replying to the previous."""
+        if not tweets:
+            return {
+                "status": "error",
+                "message": "Nothing to post."
+            }
+
+        first_tweet_id = None
+        reply_to = None
+        for posted, text in enumerate(tweets):
+            result = await self.post_tweet(text, in_reply_to_tweet_id=reply_to)
+            if result["status"] != "success":
+                if not first_tweet_id:
+                    return result
+                # The head is public, report it so the caller doesn't post the story again
+                self.last_tweet_id = first_tweet_id
+                return {
+                    "status": "partial",
+                    "message": f"Posted {posted} of {len(tweets)} tweets: {result['message']}",
+                    "tweet_id": first_tweet_id,
+                    "tweet_url": f"https://twitter.com/user/status/{first_tweet_id}"
+                }
+            reply_to = result["tweet_id"]
+            first_tweet_id = first_tweet_id or reply_to
+
+        if first_tweet_id:
+            # Replies and comments are tracked on the head of the thread
+            self.last_tweet_id = first_tweet_id
+        return {
+            "status": "success",
+            "message": f"Posted thread of {len(tweets)} tweets",
+            "tweet_id": first_tweet_id,
+            "tweet_url": f"https://twitter.com/user/status/{first_tweet_id}"
+        }
+
+    async def get_comments(self, tweet_id: str) -> List[Dict]:
+        """Get replies to a tweet from other users that we haven't answered yet."""
+        self.ensure_client()
+        if not self.client:
+            return []
+
+        try:
+            if not self.user_id:
+                me = await asyncio.to_thread(self.client.get_me)
+                self.user_id = str(me.data.id) if me and me.data else None
+
+            response = await asyncio.to_thread(
+                self.client.search_recent_tweets,
+                query=f"conversation_id:{tweet_id} -is:retweet",
+                tweet_fields=["author_id"]
+            )
+            comments = []
+            for tweet in response.data or []:
+                if str(tweet.author_id) == self.user_id or str(tweet.id) in self.replied_comment_ids:
+                    continue
+                comments.append({"id": str(tweet.id), "text": tweet.text})
+            return comments
+        except Exception as e:
+            logger.error(f"Error fetching comments: {str(e)}")
+            return []
+
+    async def reply_to_tweet(self, tweet_id: str, text: str) -> Dict:
+        """Reply to a comment, at most once per comment."""
+        if not text:
+            return {
+                "status": "error",
+                "message": "Reply text is empty."
+            }
+
+        last_tweet_id = self.last_tweet_id
+        result = await self.post_tweet(text, in_reply_to_tweet_id=tweet_id)
+        # Keep tracking comments on our post, not on our own reply
+        self.last_tweet_id = last_tweet_id
+        if result["status"] == "success":
+            self.replied_comment_ids.add(str(tweet_id))
+        return result
+
+    async def get_latest_stats(self) -> Dict:
+        """Get engagement metrics for the most recent post."""
+        stats = {
+            "tweet_id": self.last_tweet_id,
+            "likes": 0,
+            "retweets": 0,
+            "replies": 0,
+            "views": 0
+        }
+        if not self.last_tweet_id or not self.is_configured():
+            return stats
+
+        self.ensure_client()
+        if not self.client:
+            return stats
+
+        try:
+            response = await asyncio.to_thread(
+                self.client.get_tweet,
+                self.last_tweet_id,
+                tweet_fields=["public_metrics"],
+                user_auth=True
+            )
+            metrics = (response.data.public_metrics if response and response.data else None) or {}
+            stats.update({
+                "likes": metrics.get("like_count", 0),
+                "retweets": metrics.get("retweet_count", 0),
+                "replies": metrics.get("reply_count", 0),
+                "views": metrics.get("impression_count", 0)
+            })
+        except Exception as e:
+            logger.error(f"Error fetching tweet stats: {str(e)}")
+        return stats